@@ -1,7 +1,293 @@
 import os
 import json
 import locale
+import marshal
+import mmap
+import string
 import sys
+from functools import lru_cache
+
+# orjson 的 C 解析器比標準函式庫的 json 快數倍，
+# 有安裝就使用，沒有則退回標準函式庫（維持選用依賴）
+try:
+    import orjson as _json
+except ImportError:
+    _json = json
+
+def _compile_entry(value):
+    """在載入時預編譯翻譯字串
+
+    沒有佔位符的字串直接原樣儲存；含有 {name} 佔位符的字串
+    先用 string.Formatter 解析成片段，編譯成只做串接的函數，
+    之後每次呼叫就不必重新解析格式化迷你語言。
+
+    Args:
+        value (str): 翻譯字串
+
+    Returns:
+        str 或 callable: 純文字或編譯後的格式化函數
+    """
+    if '{' not in value:
+        return value
+
+    segments = list(string.Formatter().parse(value))
+
+    # 只含單純 {name} 佔位符（沒有格式規格或轉換旗標）的字串，
+    # 改編譯成 %(name)s 模板；% 運算子在 C 層執行，
+    # 比 Python 層逐段串接更快
+    simple = all(
+        field is None or (field.isidentifier() and not spec and not conversion)
+        for _literal, field, spec, conversion in segments
+    )
+    # 恰好一個單純佔位符的字串是介面字串的大宗，
+    # 再特化成「前綴 + str(值) + 後綴」：只剩三次 C 層串接
+    if simple and len(segments) <= 2 and segments[0][1] and (
+        len(segments) == 1 or segments[1][1] is None
+    ):
+        prefix = segments[0][0]
+        name = segments[0][1]
+        suffix = segments[1][0] if len(segments) > 1 else ''
+
+        def render(**kwargs):
+            return prefix + str(kwargs[name]) + suffix
+
+        render.raw = value
+        return render
+
+    if simple:
+        template = "".join(
+            literal.replace('%', '%%') + (f'%({field})s' if field else '')
+            for literal, field, _spec, _conversion in segments
+        )
+
+        def render(**kwargs):
+            return template % kwargs
+
+        render.raw = value
+        return render
+
+    def render(**kwargs):
+        parts = []
+        for literal, field, spec, conversion in segments:
+            parts.append(literal)
+            if field is not None:
+                field_value = kwargs[field]
+                if conversion == 's':
+                    field_value = str(field_value)
+                elif conversion == 'r':
+                    field_value = repr(field_value)
+                parts.append(format(field_value, spec))
+        return "".join(parts)
+
+    # 保留原始字串，格式化失敗時當作回退值
+    render.raw = value
+    return render
+
+def _compile_catalog(raw_translations):
+    """把整份翻譯字典編譯成快速格式化的形式
+
+    鍵值經過 sys.intern 處理，之後查詢時字典比較可以走
+    指標相同的快速路徑，不必逐字元比對長 UTF-8 鍵。
+    """
+    return {sys.intern(key): _compile_entry(value) for key, value in raw_translations.items()}
+
+@lru_cache(maxsize=None)
+def _load_file(path):
+    """讀取並解析單一翻譯檔
+
+    用 mmap 對映檔案內容，避免先讀進中間緩衝區；
+    結果以路徑為鍵快取，同一個檔案只解析一次。
+
+    Args:
+        path (str): 翻譯檔案路徑
+
+    Returns:
+        dict: 解析後的原始翻譯字典
+    """
+    # 空檔案無法 mmap，直接視為空目錄
+    if os.path.getsize(path) == 0:
+        return {}
+
+    # 先嘗試 marshal 快取檔：mtime 相符就完全跳過 JSON 解析
+    # （marshal 還原 dict-of-str 比 JSON 解析快一個數量級）
+    cache_path = path + '.mcache'
+    mtime = os.path.getmtime(path)
+    try:
+        with open(cache_path, 'rb') as f:
+            cached_mtime, translations = marshal.load(f)
+        if cached_mtime == mtime:
+            return translations
+    except (OSError, EOFError, ValueError, TypeError):
+        # 快取不存在或已損壞，重新解析 JSON
+        pass
+
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if _json is json:
+                # 標準函式庫的 json 只接受 str/bytes，得複製一份
+                translations = _json.loads(mm[:])
+            else:
+                # orjson 接受緩衝區協定，直接讀 mmap 頁面，零複製
+                translations = _json.loads(memoryview(mm))
+
+    # 寫回快取供下次啟動使用；寫入失敗（例如唯讀目錄）不影響功能
+    try:
+        with open(cache_path, 'wb') as f:
+            marshal.dump((mtime, translations), f)
+    except OSError:
+        pass
+
+    return translations
+
+# 找不到翻譯時的哨兵值，讓 get() 只做一次字典查詢
+_MISSING = object()
+
+# 特殊語言代碼的正規化對照表（小寫完整代碼 -> 翻譯檔語言代碼）
+_LOCALE_MAP = {
+    'zh_tw': 'zh_TW',  # 繁體中文
+    'zh_hk': 'zh_TW',
+    'zh_cn': 'zh_CN',  # 簡體中文
+}
+
+@lru_cache(maxsize=None)
+def _detect_language_cached(env_key):
+    """實際執行系統語言偵測
+
+    locale.getdefaultlocale() 會解析環境變數（部分平台還會查詢
+    系統設定），成本不低；以語言相關環境變數為鍵快取結果，
+    同樣的環境只偵測一次。
+
+    Args:
+        env_key (tuple): (LANG, LC_ALL, LC_MESSAGES) 環境變數值
+
+    Returns:
+        str: 語言代碼
+    """
+    try:
+        # 取得系統預設語言設定
+        # （locale.getdefaultlocale() 自 3.11 起已棄用，改用
+        #   locale.getlocale() / 平台 API）
+        if sys.platform == 'win32':
+            # Windows 上 getlocale() 回傳的是本地化名稱，
+            # 直接問系統 API 拿 BCP 47 語言標籤（例如 zh-TW）
+            import ctypes
+            buf = ctypes.create_unicode_buffer(85)  # LOCALE_NAME_MAX_LENGTH
+            if ctypes.windll.kernel32.GetUserDefaultLocaleName(buf, len(buf)):
+                system_locale = buf.value.replace('-', '_')
+            else:
+                system_locale = None
+        else:
+            system_locale = locale.getlocale(locale.LC_MESSAGES)[0]
+            if not system_locale:
+                # C/POSIX 環境下 getlocale 拿不到值，退回 LANG 環境變數
+                system_locale = os.environ.get('LANG', 'en').split('.')[0]
+
+        if system_locale in ('C', 'POSIX'):
+            system_locale = None
+
+        if system_locale:
+            # 先查特殊代碼對照表，沒有的話取語言代碼部分
+            # (例如 zh_TW -> zh_TW，ja_JP -> ja)
+            lc = system_locale.lower()
+            return _LOCALE_MAP.get(lc) or lc.split('_')[0]
+
+        # 如果無法取得，預設使用英文
+        return 'en'
+    except (locale.Error, ValueError, AttributeError):
+        # 偵測失敗時使用英文
+        return 'en'
+
+def _detect_system_language():
+    """偵測系統語言並返回語言代碼"""
+    env_key = tuple(os.environ.get(name) for name in ('LANG', 'LC_ALL', 'LC_MESSAGES'))
+    return _detect_language_cached(env_key)
+
+# 語言目錄中可用翻譯檔的索引（語言代碼 -> 檔案路徑）
+_LANG_INDEX = None
+
+def _lang_index(refresh=False):
+    """建立語言代碼到翻譯檔路徑的索引
+
+    用一次 os.scandir 取代逐語言的 os.path.exists 檢查，
+    之後解析回退鏈只需要做字典查詢，不再有 stat 系統呼叫。
+
+    Args:
+        refresh (bool): 強制重新掃描目錄
+
+    Returns:
+        dict: {語言代碼: 檔案路徑}
+    """
+    global _LANG_INDEX
+    if _LANG_INDEX is None or refresh:
+        script_dir = os.path.dirname(os.path.abspath(__file__))
+        lang_dir = os.path.join(script_dir, 'langs')
+        index = {}
+        try:
+            with os.scandir(lang_dir) as it:
+                for entry in it:
+                    if entry.name.endswith('.json'):
+                        index[entry.name[:-5]] = entry.path
+        except FileNotFoundError:
+            # 目錄不存在時建立它，索引維持空的
+            os.makedirs(lang_dir, exist_ok=True)
+        _LANG_INDEX = index
+    return _LANG_INDEX
+
+@lru_cache(maxsize=1024)
+def _format_cached(entry, items_tuple):
+    """呼叫編譯後的格式化函數並快取結果
+
+    相同的 (翻譯, 參數) 組合在介面中經常重複出現，
+    快取格式化結果可以省下重複的串接成本。
+
+    Args:
+        entry (callable): 編譯後的格式化函數
+        items_tuple (tuple): 排序後的 (鍵, 值) 參數組
+
+    Returns:
+        str: 格式化後的文字
+    """
+    return entry(**dict(items_tuple))
+
+@lru_cache(maxsize=1)
+def _load_bundle():
+    """載入合併所有語言的 bundle.json（存在的話）
+
+    單一合併檔只需要一次 open + 一次解析就涵蓋所有語言，
+    在 PyInstaller 之類的凍結環境中比逐語言探測檔案快得多。
+    可用 python i18n.py 重新產生。
+
+    Returns:
+        dict 或 None: {語言代碼: 翻譯字典}，沒有合併檔時為 None
+    """
+    path = _lang_index().get('bundle')
+    if not path:
+        return None
+    try:
+        return _load_file(path)
+    except (OSError, ValueError, UnicodeDecodeError):
+        return None
+
+def build_bundle():
+    """把 langs/*.json 合併成單一 bundle.json
+
+    打包發佈前執行一次，執行期就能用單一檔案載入所有語言。
+
+    Returns:
+        str: 產生的合併檔路徑
+    """
+    index = _lang_index(refresh=True)
+    bundle = {}
+    for lang, path in sorted(index.items()):
+        if lang == 'bundle':
+            continue
+        bundle[lang] = _load_file(path)
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    out_path = os.path.join(script_dir, 'langs', 'bundle.json')
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump(bundle, f, ensure_ascii=False, separators=(',', ':'))
+    return out_path
 
 class I18n:
     """國際化支援類別"""
@@ -13,85 +299,84 @@ class I18n:
         Args:
             lang (str, optional): 指定語言代碼，如不指定則自動偵測系統語言
         """
-        # 儲存所有翻譯
-        self.translations = {}
-        
+        # 合併後的翻譯字典，第一次查詢時才載入
+        self.translations = None
+
+        # 載入後綁定成 translations.get，查詢時少一層屬性查找
+        self._get_entry = None
+
         # 設定語言
         if lang:
             self.current_lang = lang
         else:
-            self.current_lang = self._detect_system_language()
-        
-        # 載入翻譯
-        self._load_translations()
-    
-    def _detect_system_language(self):
-        """偵測系統語言並返回語言代碼"""
-        try:
-            # 取得系統預設語言設定
-            system_locale, encoding = locale.getdefaultlocale()
-            
-            if system_locale:
-                # 取得語言代碼部分 (例如 zh_TW -> zh)
-                lang_code = system_locale.split('_')[0]
-                
-                # 處理特殊情況：繁體中文
-                if system_locale.lower() in ['zh_tw', 'zh_hk']:
-                    return 'zh_TW'  # 繁體中文
-                elif system_locale.lower() == 'zh_cn':
-                    return 'zh_CN'  # 簡體中文
-                
-                return lang_code
-            
-            # 如果無法取得，預設使用英文
-            return 'en'
-        except:
-            # 發生錯誤時使用英文
-            return 'en'
+            self.current_lang = _detect_system_language()
+
+        # 只解析回退鏈的檔案路徑，實際內容等第一次查詢時才載入
+        self._lang_files = self._resolve_lang_files()
     
-    def _load_translations(self):
-        """載入翻譯檔案"""
+    def _resolve_lang_files(self):
+        """解析回退鏈中存在的翻譯檔案路徑
+
+        回退順序為：目前語言 → 父語言（例如 zh_TW -> zh）→ 英文。
+        只在這裡檢查一次檔案是否存在，不讀取內容。
+
+        Returns:
+            list: 依回退順序排列的翻譯檔案路徑
+        """
         try:
-            # 尋找翻譯檔案目錄
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            lang_dir = os.path.join(script_dir, 'langs')
-            
-            # 如果目錄不存在，建立它
-            if not os.path.exists(lang_dir):
-                os.makedirs(lang_dir)
-            
-            # 嘗試載入特定語言的翻譯
-            lang_file = os.path.join(lang_dir, f'{self.current_lang}.json')
-            
-            # 檢查檔案是否存在
-            if os.path.exists(lang_file):
-                with open(lang_file, 'r', encoding='utf-8') as f:
-                    self.translations = json.load(f)
-            else:
-                # 如果找不到目前語言的翻譯檔，嘗試找回退語言
-                if '_' in self.current_lang:
-                    # 例如：zh_TW -> zh
-                    fallback_lang = self.current_lang.split('_')[0]
-                    fallback_file = os.path.join(lang_dir, f'{fallback_lang}.json')
-                    
-                    if os.path.exists(fallback_file):
-                        with open(fallback_file, 'r', encoding='utf-8') as f:
-                            self.translations = json.load(f)
-                    else:
-                        # 如果回退語言也沒找到，再嘗試英文
-                        en_file = os.path.join(lang_dir, 'en.json')
-                        if os.path.exists(en_file):
-                            with open(en_file, 'r', encoding='utf-8') as f:
-                                self.translations = json.load(f)
-                else:
-                    # 直接嘗試英文
-                    en_file = os.path.join(lang_dir, 'en.json')
-                    if os.path.exists(en_file):
-                        with open(en_file, 'r', encoding='utf-8') as f:
-                            self.translations = json.load(f)
-        except Exception as e:
-            # 清空翻譯以防止錯誤
-            self.translations = {}
+            index = _lang_index()
+            paths = []
+            for lang in self._fallback_chain():
+                path = index.get(lang)
+                if path:
+                    paths.append(path)
+            return paths
+        except OSError as e:
+            # 無法存取語言目錄時視為沒有翻譯檔
+            return []
+
+    def _fallback_chain(self):
+        """回退順序的語言代碼清單（去除重複並保留順序）"""
+        candidates = [self.current_lang]
+        if '_' in self.current_lang:
+            # 例如：zh_TW -> zh
+            candidates.append(self.current_lang.split('_')[0])
+        candidates.append('en')
+        return list(dict.fromkeys(candidates))
+
+    def _ensure_loaded(self):
+        """第一次查詢時把回退鏈合併成單一字典
+
+        由低優先度往高優先度合併（en → 父語言 → 目前語言），
+        讓目前語言的翻譯覆蓋回退值。之後每次查詢就只需要
+        一次字典查詢，不必逐一探測多個回退目錄。
+
+        Returns:
+            dict: 合併後的翻譯字典
+        """
+        merged = {}
+
+        # 有合併檔時直接從裡面切出各語言，不碰個別翻譯檔
+        bundle = _load_bundle()
+        if bundle is not None:
+            for lang in reversed(self._fallback_chain()):
+                catalog = bundle.get(lang)
+                if catalog:
+                    merged.update(_compile_catalog(catalog))
+            self.translations = merged
+            self._get_entry = merged.get
+            return merged
+
+        for path in reversed(self._lang_files):
+            try:
+                merged.update(_compile_catalog(_load_file(path)))
+            except (OSError, ValueError, UnicodeDecodeError) as e:
+                # 檔案不可讀或 JSON 損壞時跳過，繼續合併其他回退檔
+                # （json 與 orjson 的解析錯誤都是 ValueError 的子類別）
+                continue
+        self.translations = merged
+        self._get_entry = merged.get
+        return merged
     
     def get(self, key, **kwargs):
         """
@@ -104,36 +389,122 @@ class I18n:
         Returns:
             str: 翻譯後的文字
         """
-        if key in self.translations:
-            # 找到翻譯，套用格式化參數
-            try:
-                return self.translations[key].format(**kwargs)
-            except KeyError as e:
-                # 格式化參數錯誤
-                return self.translations[key]
-            except Exception as e:
-                # 其他錯誤
-                return self.translations[key]
-        else:
+        lookup = self._get_entry
+        if lookup is None:
+            self._ensure_loaded()
+            lookup = self._get_entry
+
+        entry = lookup(key, _MISSING)
+
+        if entry is _MISSING:
             # 找不到翻譯，返回原始文字
             return key
 
+        # 最常見的情況放最前面：純文字翻譯（載入時已判定沒有
+        # 佔位符）直接返回，完全不碰格式化機制
+        if type(entry) is str:
+            return entry
+
+        # 沒有格式化參數時返回原始字串，不執行格式化
+        if not kwargs:
+            return entry.raw
+
+        # 呼叫編譯後的格式化函數（結果會被快取）
+        try:
+            return _format_cached(entry, tuple(sorted(kwargs.items())))
+        except TypeError:
+            # 參數含有不可雜湊的值，無法快取，直接格式化
+            try:
+                return entry(**kwargs)
+            except Exception as e:
+                return entry.raw
+        except KeyError as e:
+            # 格式化參數錯誤
+            return entry.raw
+        except Exception as e:
+            # 其他錯誤
+            return entry.raw
+
 # 全域的i18n物件
 _i18n = None
 
+# 依語言代碼快取的 I18n 實例，重複初始化或切換語言時直接重用
+_INSTANCES = {}
+
 def init_i18n(lang=None):
-    """初始化國際化支援"""
+    """初始化國際化支援
+
+    同一個語言的實例會被快取，重複呼叫（或來回切換語言）
+    只是字典查詢，不會重新讀取翻譯檔。
+
+    呼叫後模組層級的 _ 會直接綁定到實例的 get 方法，
+    省去每次翻譯呼叫的全域查詢與 None 檢查。
+    （注意：以 from i18n import _ 先取得參照的模組不受影響，
+    仍會走下面的延遲初始化版本。）
+    """
     global _i18n
-    _i18n = I18n(lang)
+    key = lang or _detect_system_language()
+    instance = _INSTANCES.get(key)
+    if instance is None:
+        instance = _INSTANCES[key] = I18n(key)
+    _i18n = instance
+    globals()['_'] = _i18n.get
+    # 同步更新替身快取的綁定方法（見 _LazyTranslator）
+    _lazy_translator._get = _i18n.get
     return _i18n
 
-def _(key, **kwargs):
-    """翻譯函數，可作為全域函數使用"""
-    global _i18n
-    if _i18n is None:
-        _i18n = I18n()
-    return _i18n.get(key, **kwargs)
+def switch_language(lang):
+    """切換目前使用的語言"""
+    return init_i18n(lang)
+
+class _LazyTranslator:
+    """翻譯入口的啟動替身，第一次呼叫時才初始化
+
+    第一次呼叫會初始化 i18n 並把綁定方法快取在自己身上，
+    之後的呼叫不再檢查 _i18n is None，也不再查模組全域。
+    模組層級的 _ 同時會被 init_i18n() 換成 _i18n.get 本身；
+    先用 from i18n import _ 拿到本物件的呼叫端則繼續透過
+    快取的綁定方法轉呼叫。
+    """
+
+    __slots__ = ('_get',)
+
+    def __init__(self):
+        self._get = None
+
+    def __call__(self, key, /, **kwargs):
+        get = self._get
+        if get is None:
+            # 第一次呼叫：初始化並快取綁定方法
+            if _i18n is None:
+                init_i18n()
+            get = self._get = _i18n.get
+
+        if kwargs:
+            # intern 鍵值讓字典查詢走指標相同的快速路徑
+            # （字面值大多已被 CPython intern，這裡處理動態組出的鍵）
+            if type(key) is str:
+                key = sys.intern(key)
+            return get(key, **kwargs)
+
+        # 無參數的快速路徑（絕大多數呼叫）：直接查合併後的字典
+        translations = _i18n.translations
+        if translations is None:
+            translations = _i18n._ensure_loaded()
+        entry = translations.get(key, key)
+        return entry if type(entry) is str else entry.raw
+
+# 翻譯函數，可作為全域函數使用；init_i18n() 之後會被換成 _i18n.get
+_ = _LazyTranslator()
+
+# 保留對替身的參照，讓 init_i18n() 能同步更新
+# 已經 import 了舊 _ 的呼叫端
+_lazy_translator = _
 
 # 用法示例：
 # init_i18n()  # 初始化，自動偵測系統語言
 # print(_("正在獲取影片資訊，請稍候..."))  # 獲取翻譯
+
+if __name__ == "__main__":
+    # 直接執行本模組會重建 langs/bundle.json
+    print(build_bundle())
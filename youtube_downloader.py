@@ -1,24 +1,82 @@
 #!/usr/bin/env python3
+import argparse
 import sys
 import subprocess
 import json
 import re
 import os
+import tempfile
 import time
 import shutil
 import platform
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from i18n import init_i18n, _
 
+# yt-dlp -J 的輸出動輒數 MB，orjson 的 C 解析器比標準函式庫快數倍，
+# 沒安裝時退回標準 json
+try:
+    import orjson as _json
+except ImportError:
+    _json = json
+
+def _run_probe(cmd, timeout=3):
+    """執行一個偵測用子程序
+
+    找不到程式、執行失敗或逾時都視為「不可用」，回傳 None，
+    讓呼叫端不必逐一處理例外。
+
+    Args:
+        cmd (list): 要執行的命令
+        timeout (int): 逾時秒數，避免偵測卡住整個程式
+
+    Returns:
+        CompletedProcess 或 None
+    """
+    try:
+        return subprocess.run(cmd, capture_output=True, text=True, timeout=timeout)
+    except (FileNotFoundError, subprocess.TimeoutExpired, OSError):
+        return None
+
+# 預先編譯熱路徑上重複使用的正規表達式
+# （移除播放清單參數的三條規則與對應的替換字串）
+_PLAYLIST_PATTERNS = (
+    (re.compile(r'&list=[^&]*'), ''),
+    (re.compile(r'\?list=[^&]*&'), '?'),
+    (re.compile(r'\?list=[^&]*$'), ''),
+)
+
+# YouTube 影片 URL 的基本格式檢查
+_YOUTUBE_URL_RE = re.compile(r'youtube\.com/watch\?v=|youtu\.be/')
+
+# ffmpeg -encoders 的條目格式：六個旗標字元（V/A/S + FSXBD）後接編碼器名稱
+_ENC_RE = re.compile(r'^\s[VAS][.F][.S][.X][.B][.D]\s+(\S+)')
+
+def _strip_playlist(url):
+    """移除 URL 中的播放清單參數，確保只處理單個影片"""
+    for pattern, replacement in _PLAYLIST_PATTERNS:
+        url = pattern.sub(replacement, url)
+    return url
+
+def _unlink_quiet(path):
+    """刪除檔案，不存在就算了
+
+    直接 unlink 並忽略 FileNotFoundError，比先 exists 再 remove
+    少一次 stat，也沒有兩個呼叫之間檔案被動過的空窗。
+    """
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
 def get_video_info(url):
     """獲取影片格式資訊"""
     try:
         print(_("正在獲取影片資訊，請稍候..."))
-        
+
         # 修改URL，確保只處理單個影片而不是播放清單
-        # 移除播放清單相關參數
-        url = re.sub(r'&list=[^&]*', '', url)
-        url = re.sub(r'\?list=[^&]*&', '?', url)
-        url = re.sub(r'\?list=[^&]*$', '', url)
+        url = _strip_playlist(url)
         
         # 添加 --no-playlist 參數確保只處理單個影片
         cmd = ["yt-dlp", "-J", "--no-playlist", url]
@@ -32,12 +90,13 @@ def get_video_info(url):
             sys.exit(1)
         
         # 解析 JSON 輸出
-        video_info = json.loads(result.stdout)
+        video_info = _json.loads(result.stdout)
         return video_info
     except subprocess.TimeoutExpired:
         print(_("錯誤：獲取影片資訊逾時，請檢查網路連線或嘗試簡化URL"))
         sys.exit(1)
-    except json.JSONDecodeError:
+    except ValueError:
+        # json 與 orjson 的解析錯誤都是 ValueError 的子類別
         print(_("錯誤：解析影片資訊失敗，收到的不是有效的JSON資料"))
         sys.exit(1)
     except Exception as e:
@@ -59,34 +118,26 @@ def filter_formats(formats):
     
     return video_formats, audio_formats
 
+def _video_sort_key(fmt):
+    """影片格式的比較鍵：先比解析度高度，再比總位元率"""
+    return (fmt.get('height', 0) or 0, fmt.get('tbr', 0) or 0)
+
+def _audio_sort_key(fmt):
+    """音訊格式的比較鍵：總位元率"""
+    return fmt.get('tbr', 0) or 0
+
 def get_best_formats(video_formats, audio_formats):
     """找出最高畫質和最高音質的格式"""
-    # 按解析度和位元率排序影片格式
-    sorted_videos = sorted(
-        video_formats, 
-        key=lambda x: (
-            x.get('height', 0) or 0,  # 先按照高度排序
-            x.get('tbr', 0) or 0      # 然後按照總位元率排序
-        ), 
-        reverse=True
-    )
-    
-    # 按位元率排序聲音格式
-    sorted_audios = sorted(
-        audio_formats, 
-        key=lambda x: x.get('tbr', 0) or 0,  # 按照總位元率排序
-        reverse=True
-    )
-    
-    if not sorted_videos:
+    # 只需要最佳的一個，用 max 做線性掃描即可，不必完整排序
+    best_video = max(video_formats, key=_video_sort_key, default=None)
+    best_audio = max(audio_formats, key=_audio_sort_key, default=None)
+
+    if best_video is None:
         print(_("警告：找不到影片流"))
-        return None, sorted_audios[0] if sorted_audios else None
-    
-    if not sorted_audios:
+    if best_audio is None:
         print(_("警告：找不到聲音流"))
-        return sorted_videos[0], None
-    
-    return sorted_videos[0], sorted_audios[0]
+
+    return best_video, best_audio
 
 def print_format_info(format_info, format_type):
     """顯示格式資訊"""
@@ -118,8 +169,117 @@ def print_format_info(format_info, format_type):
         
     print(_("  副檔名: {ext}").format(ext=format_info.get('ext')))
 
+def _windows_gpu_vendors():
+    """列舉 Windows 顯示卡廠商
+
+    直接呼叫 user32 的 EnumDisplayDevicesW，比冷啟動
+    PowerShell + WMI（動輒一到三秒）快一到兩個數量級。
+    列舉失敗時退回掃描註冊表中 PCI 裝置的廠商 ID。
+
+    Returns:
+        set: 偵測到的廠商集合，元素為 "NVIDIA" / "AMD" / "Intel"
+    """
+    vendors = set()
+    try:
+        import ctypes
+
+        class DISPLAY_DEVICEW(ctypes.Structure):
+            _fields_ = [
+                ("cb", ctypes.c_ulong),
+                ("DeviceName", ctypes.c_wchar * 32),
+                ("DeviceString", ctypes.c_wchar * 128),
+                ("StateFlags", ctypes.c_ulong),
+                ("DeviceID", ctypes.c_wchar * 128),
+                ("DeviceKey", ctypes.c_wchar * 128),
+            ]
+
+        device = DISPLAY_DEVICEW()
+        device.cb = ctypes.sizeof(device)
+        index = 0
+        while ctypes.windll.user32.EnumDisplayDevicesW(None, index, ctypes.byref(device), 0):
+            description = device.DeviceString.upper()
+            device_id = device.DeviceID.upper()
+            if "NVIDIA" in description or "VEN_10DE" in device_id:
+                vendors.add("NVIDIA")
+            if "AMD" in description or "RADEON" in description or "VEN_1002" in device_id:
+                vendors.add("AMD")
+            if "INTEL" in description or "VEN_8086" in device_id:
+                vendors.add("Intel")
+            index += 1
+    except (OSError, AttributeError):
+        pass  # 非 Windows 或呼叫失敗，嘗試註冊表
+
+    if vendors:
+        return vendors
+
+    # 回退：掃描 PCI 裝置的廠商 ID（0x10DE NVIDIA / 0x1002 AMD / 0x8086 Intel）
+    # 注意 VEN_8086 也包含 Intel 晶片組裝置，只是近似判斷
+    try:
+        import winreg
+        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE,
+                            r"SYSTEM\CurrentControlSet\Enum\PCI") as pci_key:
+            count = winreg.QueryInfoKey(pci_key)[0]
+            for idx in range(count):
+                name = winreg.EnumKey(pci_key, idx)
+                if "VEN_10DE" in name:
+                    vendors.add("NVIDIA")
+                elif "VEN_1002" in name:
+                    vendors.add("AMD")
+                elif "VEN_8086" in name:
+                    vendors.add("Intel")
+    except (ImportError, OSError):
+        pass  # 沒有註冊表可查
+
+    return vendors
+
+def _nvml_gpu_count():
+    """以 NVML 函式庫在行程內查詢 NVIDIA GPU 數量
+
+    我們只需要「有沒有 NVIDIA GPU」這一個答案，不必為此 fork 整個
+    nvidia-smi；直接載入 NVML 查詢只要約一毫秒。優先使用 pynvml，
+    沒裝的話用 ctypes 直接載入函式庫。
+
+    Returns:
+        int 或 None: GPU 數量；NVML 無法使用時回傳 None，
+        由呼叫端退回 nvidia-smi 偵測
+    """
+    try:
+        import pynvml
+        pynvml.nvmlInit()
+        try:
+            return pynvml.nvmlDeviceGetCount()
+        finally:
+            pynvml.nvmlShutdown()
+    except Exception:
+        pass
+
+    import ctypes
+    lib_name = "nvml.dll" if platform.system() == "Windows" else "libnvidia-ml.so.1"
+    try:
+        nvml = ctypes.CDLL(lib_name)
+    except OSError:
+        return None  # 沒有 NVIDIA 驅動
+    try:
+        if nvml.nvmlInit_v2() != 0:
+            return None
+        try:
+            count = ctypes.c_uint()
+            if nvml.nvmlDeviceGetCount_v2(ctypes.byref(count)) != 0:
+                return None
+            return count.value
+        finally:
+            nvml.nvmlShutdown()
+    except (OSError, AttributeError):
+        return None
+
+@lru_cache(maxsize=1)
 def detect_hardware_acceleration():
-    """偵測系統支援的硬體加速方式"""
+    """偵測系統支援的硬體加速方式
+
+    偵測會啟動 nvidia-smi / PowerShell / vainfo 等子程序，
+    每次都要數百毫秒，而結果在程式執行期間不會改變，
+    所以只偵測一次並快取結果。
+    """
     system = platform.system()
     
     if system == "Darwin":  # macOS
@@ -131,75 +291,70 @@ def detect_hardware_acceleration():
         }
     
     elif system == "Windows":
-        # 嘗試偵測 GPU 類型
-        try:
-            # 檢查 NVIDIA GPU
-            nvidia_result = subprocess.run(["nvidia-smi"], capture_output=True, text=True)
-            if nvidia_result.returncode == 0:
-                print(_("偵測到 NVIDIA GPU，將使用 NVENC 硬體加速"))
-                return {
-                    "encoder": "hevc_nvenc",
-                    "hwaccel": "cuda",
-                    "options": ["-rc", "vbr_hq"]  # 使用高品質可變位元率模式
-                }
-        except FileNotFoundError:
-            pass  # 沒有 NVIDIA GPU 或驅動程式
-        
-        try:
-            # 檢查 AMD GPU (Windows)
-            # 使用 PowerShell 檢查顯示卡資訊
-            ps_command = "Get-WmiObject Win32_VideoController | Select-Object -Property Name"
-            gpu_info = subprocess.run(["powershell", "-Command", ps_command], capture_output=True, text=True)
-            
-            if "AMD" in gpu_info.stdout:
-                print(_("偵測到 AMD GPU，將使用 AMF 硬體加速"))
-                return {
-                    "encoder": "hevc_amf",
-                    "hwaccel": "amf",
-                    "options": ["-quality", "quality"]
-                }
-        except Exception:
-            pass  # PowerShell 命令執行失敗或無法識別
-        
-        try:
-            # 檢查 Intel GPU (Windows)
-            if "Intel" in gpu_info.stdout:
-                print(_("偵測到 Intel GPU，將使用 QSV 硬體加速"))
-                return {
-                    "encoder": "hevc_qsv",
-                    "hwaccel": "qsv",
-                    "options": ["-load_plugin", "hevc_hw"]
-                }
-        except Exception:
-            pass  # 無法識別 Intel GPU
-    
+        # 直接用系統 API 列舉顯示卡，不再冷啟動 PowerShell + WMI
+        vendors = _windows_gpu_vendors()
+
+        # 依優先順序挑選：NVIDIA > AMD > Intel
+        if "NVIDIA" in vendors:
+            print(_("偵測到 NVIDIA GPU，將使用 NVENC 硬體加速"))
+            return {
+                "encoder": "hevc_nvenc",
+                "hwaccel": "cuda",
+                "options": ["-rc", "vbr_hq"]  # 使用高品質可變位元率模式
+            }
+
+        if "AMD" in vendors:
+            print(_("偵測到 AMD GPU，將使用 AMF 硬體加速"))
+            return {
+                "encoder": "hevc_amf",
+                "hwaccel": "amf",
+                "options": ["-quality", "quality"]
+            }
+
+        if "Intel" in vendors:
+            print(_("偵測到 Intel GPU，將使用 QSV 硬體加速"))
+            return {
+                "encoder": "hevc_qsv",
+                "hwaccel": "qsv",
+                "options": ["-load_plugin", "hevc_hw"]
+            }
+
     elif system == "Linux":
-        # 在 Linux 上嘗試偵測 GPU
-        try:
-            # 檢查 NVIDIA GPU
-            nvidia_result = subprocess.run(["nvidia-smi"], capture_output=True, text=True)
-            if nvidia_result.returncode == 0:
-                print(_("偵測到 NVIDIA GPU，將使用 NVENC 硬體加速"))
-                return {
-                    "encoder": "hevc_nvenc",
-                    "hwaccel": "cuda",
-                    "options": ["-rc", "vbr_hq"]
-                }
-        except FileNotFoundError:
-            pass  # 沒有 NVIDIA GPU 或驅動程式
-        
-        try:
-            # 檢查 VAAPI 支援 (Intel/AMD on Linux)
-            vaapi_result = subprocess.run(["vainfo"], capture_output=True, text=True)
-            if vaapi_result.returncode == 0 and "HEVC" in vaapi_result.stdout:
-                print(_("偵測到 VAAPI 支援 (Intel/AMD GPU)，將使用 VAAPI 硬體加速"))
-                return {
-                    "encoder": "hevc_vaapi",
-                    "hwaccel": "vaapi",
-                    "options": ["-vaapi_device", "/dev/dri/renderD128"]
-                }
-        except FileNotFoundError:
-            pass  # 沒有 VAAPI 支援
+        # 先用行程內的 NVML 查詢，有明確答案就不用啟動 nvidia-smi
+        nvml_count = _nvml_gpu_count()
+        if nvml_count:
+            print(_("偵測到 NVIDIA GPU，將使用 NVENC 硬體加速"))
+            return {
+                "encoder": "hevc_nvenc",
+                "hwaccel": "cuda",
+                "options": ["-rc", "vbr_hq"]
+            }
+
+        # 在 Linux 上同時偵測 NVIDIA 與 VAAPI
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            # NVML 載入失敗時才需要 nvidia-smi 再確認一次
+            nvidia_future = (pool.submit(_run_probe, ["nvidia-smi", "-L"], 2)
+                             if nvml_count is None else None)
+            vaapi_future = pool.submit(_run_probe, ["vainfo"], 3)
+            nvidia_result = nvidia_future.result() if nvidia_future else None
+            vaapi_result = vaapi_future.result()
+
+        if nvidia_result and nvidia_result.returncode == 0:
+            print(_("偵測到 NVIDIA GPU，將使用 NVENC 硬體加速"))
+            return {
+                "encoder": "hevc_nvenc",
+                "hwaccel": "cuda",
+                "options": ["-rc", "vbr_hq"]
+            }
+
+        # VAAPI 支援 (Intel/AMD on Linux)
+        if vaapi_result and vaapi_result.returncode == 0 and "HEVC" in vaapi_result.stdout:
+            print(_("偵測到 VAAPI 支援 (Intel/AMD GPU)，將使用 VAAPI 硬體加速"))
+            return {
+                "encoder": "hevc_vaapi",
+                "hwaccel": "vaapi",
+                "options": ["-vaapi_device", "/dev/dri/renderD128"]
+            }
     
     # 如果沒有找到任何硬體加速方式，使用軟體編碼
     print(_("未偵測到支援的硬體加速，將使用 CPU 編碼"))
@@ -209,16 +364,209 @@ def detect_hardware_acceleration():
         "options": ["-preset", "medium"]
     }
 
-def download_video(url, video_format, audio_format, output_dir=None, convert_hevc=True):
-    """下載影片並選擇性轉換為H.265格式"""
+def _conversion_params(video_format, audio_format):
+    """從原始格式推算轉檔用的影片/音訊位元率與FPS
+
+    Args:
+        video_format (dict): 影片格式資訊
+        audio_format (dict): 音訊格式資訊
+
+    Returns:
+        tuple: (video_bitrate, audio_bitrate, fps)，位元率為 "8000k" 形式
+    """
+    # 從原始格式中獲取影片參數
+    if video_format and video_format.get('tbr'):
+        # 使用與原影片相同的位元率
+        video_bitrate = f"{int(video_format['tbr'])}k"
+    elif video_format and 'height' in video_format:
+        # 如果無法取得原始位元率，使用合理的預設值（根據解析度）
+        height = video_format['height']
+        if height >= 2160:    # 4K
+            video_bitrate = "30000k"
+        elif height >= 1440:  # 2K
+            video_bitrate = "15000k"
+        elif height >= 1080:  # 1080p
+            video_bitrate = "8000k"
+        elif height >= 720:   # 720p
+            video_bitrate = "4000k"
+        else:                # 480p或更低
+            video_bitrate = "2000k"
+    else:
+        # 預設位元率
+        video_bitrate = "8000k"
+
+    # 從原始格式中獲取音訊參數
+    if audio_format and audio_format.get('tbr'):
+        # 使用與原始音訊相同的位元率
+        audio_bitrate = f"{int(audio_format['tbr'])}k"
+    elif audio_format and audio_format.get('abr') is not None:
+        # 部分格式使用 abr 而非 tbr
+        audio_bitrate = f"{int(audio_format['abr'])}k"
+    else:
+        # 預設音訊位元率
+        audio_bitrate = "192k"
+        print(_("無法確定原始音訊位元率，使用預設值：{bitrate}").format(bitrate=audio_bitrate))
+
+    # 從原始格式中獲取FPS
+    fps = None
+    if video_format and video_format.get('fps') is not None:
+        fps = video_format['fps']
+
+    return video_bitrate, audio_bitrate, fps
+
+def _hwaccel_input_args(hw_accel, video_format):
+    """產生讓解碼端也走 GPU 的輸入參數
+
+    在 -i 之前加上 -hwaccel_output_format，解碼後的畫面會留在
+    GPU 記憶體直接交給編碼器，省掉每張畫面來回 PCIe 的搬運。
+    NVENC 路徑另外依來源編碼挑選對應的 CUVID 解碼器。
+
+    Args:
+        hw_accel (dict): detect_hardware_acceleration() 的結果
+        video_format (dict): 影片格式資訊（用來判斷來源編碼）
+
+    Returns:
+        list: 放在 -i 之前的 ffmpeg 參數
+    """
+    hwaccel = hw_accel["hwaccel"]
+    if not hwaccel:
+        return []
+
+    args = ["-hwaccel", hwaccel]
+    if hwaccel == "cuda":
+        args.extend(["-hwaccel_output_format", "cuda"])
+        # 依來源編碼選擇 CUVID 解碼器
+        vcodec = (video_format or {}).get('vcodec') or ''
+        for prefix, decoder in (("avc", "h264_cuvid"), ("h264", "h264_cuvid"),
+                                ("hev", "hevc_cuvid"), ("hvc", "hevc_cuvid"),
+                                ("vp9", "vp9_cuvid"), ("av01", "av1_cuvid")):
+            if vcodec.startswith(prefix):
+                args.extend(["-c:v", decoder])
+                break
+    elif hwaccel in ("vaapi", "qsv"):
+        args.extend(["-hwaccel_output_format", hwaccel])
+    return args
+
+# NVENC 的 p1~p7 預設檔：p1 最快、p7 品質最好
+_NVENC_PRESETS = {"speed": "p1", "balanced": "p4", "quality": "p7"}
+
+# 由 --quality-mode 旗標設定，啟動後不再改變
+_quality_mode = "balanced"
+
+def _encoder_args(hw_accel, video_bitrate, quality_mode="balanced"):
+    """依選定的編碼器產生對應的位元率/品質參數
+
+    Args:
+        hw_accel (dict): detect_hardware_acceleration() 的結果
+        video_bitrate (str): 影片位元率，"8000k" 形式
+        quality_mode (str): speed/balanced/quality，目前只影響 NVENC 預設檔
+
+    Returns:
+        list: 傳給 ffmpeg 的參數
+    """
+    encoder = hw_accel["encoder"]
+    if encoder == "libx265":
+        return ["-crf", "22", "-preset", "medium", "-tag:v", "hvc1"]
+    if encoder == "hevc_nvenc":
+        # 位元率數值只解析一次，maxrate/bufsize 都由它導出
+        rate = int(float(video_bitrate.replace("k", "")))
+        return ["-preset", _NVENC_PRESETS.get(quality_mode, "p4"),
+                "-tune", "hq", "-rc:v", "vbr", "-cq:v", "22",
+                "-b:v", video_bitrate,
+                "-maxrate:v", f"{int(rate * 1.5)}k",
+                "-bufsize", f"{rate * 3}k",
+                "-spatial-aq", "1", "-b_ref_mode", "middle", "-bf", "3"]
+    if encoder == "hevc_videotoolbox":
+        return ["-q:v", "50", "-b:v", video_bitrate, "-tag:v", "hvc1"]
+    if encoder == "hevc_amf":
+        return ["-quality", "quality", "-b:v", video_bitrate]
+    if encoder in ("hevc_qsv", "hevc_vaapi"):
+        return ["-b:v", video_bitrate, "-global_quality", "22"]
+    return []
+
+@lru_cache(maxsize=None)
+def _ffmpeg_cmd_builder(quality_mode="balanced"):
+    """依偵測到的編碼器預組固定參數，回傳組出完整命令的閉包
+
+    編碼器在程式啟動後不會改變，每次轉檔都重新組 -c:v 與品質參數
+    是浪費。固定段只算一次，之後的呼叫只填入會隨檔案變動的部分
+    （輸入參數、輸入檔、位元率、FPS、輸出檔）。
+    """
+    hw_accel = detect_hardware_acceleration()
+    head = ["-c:v", hw_accel["encoder"]] + hw_accel["options"]
+
+    # libx265 的品質參數與位元率無關，整段預組；
+    # 其他編碼器先綁定偵測結果，呼叫時只剩位元率一個變數
+    if hw_accel["encoder"] == "libx265":
+        fixed_enc_args = _encoder_args(hw_accel, "")
+        def enc_args(video_bitrate):
+            return fixed_enc_args
+    else:
+        def enc_args(video_bitrate):
+            return _encoder_args(hw_accel, video_bitrate, quality_mode)
+
+    def make_cmd(input_args, input_file, video_bitrate, audio_bitrate, fps, output_file):
+        cmd = ["ffmpeg"] + input_args + ["-i", input_file] + head
+        if fps:
+            cmd += ["-r", str(fps)]
+        cmd += enc_args(video_bitrate)
+        cmd += ["-c:a", "aac", "-b:a", audio_bitrate,
+                "-progress", "pipe:1", "-nostats", output_file]
+        return cmd
+
+    return make_cmd
+
+def _run_ffmpeg_with_progress(process):
+    """讀取 ffmpeg 的結構化進度輸出並顯示
+
+    搭配 -progress pipe:1 -nostats 使用：進度以 key=value 行輸出，
+    每批以 progress=continue/end 結尾。這裡累積一批只更新一次
+    畫面，取代過去對每行非結構化輸出做子字串掃描的做法。
+
+    Args:
+        process: 已啟動的 ffmpeg Popen 物件（stdout 含進度流）
+
+    Returns:
+        int: 程序的回傳代碼
+    """
+    record = {}
+    for line in process.stdout:
+        line = line.strip()
+        if not line:
+            continue
+        key, sep, value = line.partition('=')
+        if not sep:
+            # 混在同一條流裡的一般訊息，只檢查錯誤
+            if "error" in line.lower() or "fatal" in line.lower():
+                print(f"\n錯誤: {line}")
+            continue
+        record[key] = value
+        if key == "progress":
+            # 一批進度只印一次
+            shown = " ".join(
+                f"{name}={record[name]}"
+                for name in ("frame", "fps", "bitrate", "out_time", "speed")
+                if name in record
+            )
+            if shown:
+                print(f"\r{shown}", end='')
+            record.clear()
+    return process.wait()
+
+def download_video(url, video_format, audio_format, output_dir=None, convert_hevc=True, video_info=None):
+    """下載影片並選擇性轉換為H.265格式
+
+    Args:
+        video_info (dict, optional): get_video_info() 已取得的完整影片
+            資訊；提供時會寫成 --load-info-json 讓 yt-dlp 重用，
+            省掉第二次完整擷取（通常要 3~10 秒的網路往返）
+    """
     if not video_format and not audio_format:
         print(_("錯誤：沒有找到可下載的格式"))
         return None
     
     # 移除播放清單參數
-    url = re.sub(r'&list=[^&]*', '', url)
-    url = re.sub(r'\?list=[^&]*&', '?', url)
-    url = re.sub(r'\?list=[^&]*$', '', url)
+    url = _strip_playlist(url)
     
     # 準備下載命令
     cmd = ["yt-dlp"]
@@ -235,9 +583,12 @@ def download_video(url, video_format, audio_format, output_dir=None, convert_hev
     
     # 不下載播放清單
     cmd.append("--no-playlist")
-    
+
     # 增加進度條顯示
     cmd.append("--progress")
+
+    # 分段影片（DASH/HLS）同時下載 4 個片段
+    cmd.extend(["-N", "4"])
     
     # 處理輸出路徑
     if output_dir:
@@ -258,9 +609,22 @@ def download_video(url, video_format, audio_format, output_dir=None, convert_hev
     
     # 取得影片實際檔名，供後續轉檔使用
     cmd.extend(["--print", "after_move:filepath"])
-    
-    # 添加URL
-    cmd.append(url)
+
+    # 已有完整影片資訊時寫成暫存檔讓 yt-dlp 重用，
+    # 不必再做一次完整擷取
+    info_json_path = None
+    if video_info:
+        try:
+            fd, info_json_path = tempfile.mkstemp(suffix=".info.json")
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(video_info, f)
+            cmd.extend(["--load-info-json", info_json_path])
+        except OSError:
+            info_json_path = None
+
+    # 沒有資訊檔時才需要 URL
+    if info_json_path is None:
+        cmd.append(url)
     
     print(_("即將下載影片，使用以下命令："))
     print(" ".join(cmd))
@@ -287,21 +651,105 @@ def download_video(url, video_format, audio_format, output_dir=None, convert_hev
         print(_("下載完成！"))
         
         # 如果沒有找到檔案路徑，嘗試搜尋目錄中最新的檔案
+        # （scandir 會附帶快取的 stat 資訊，不用每個檔案再 stat 兩次）
         if not output_file:
-            files = [os.path.join(output_dir, f) for f in os.listdir(output_dir) 
-                     if os.path.isfile(os.path.join(output_dir, f))]
-            if files:
-                output_file = max(files, key=os.path.getmtime)
+            with os.scandir(output_dir) as it:
+                entries = [e for e in it if e.is_file()]
+            if entries:
+                output_file = max(entries, key=lambda e: e.stat().st_mtime).path
                 print(_("找到下載的檔案：{file}").format(file=output_file))
             else:
                 print(_("警告：無法確定下載的檔案位置"))
                 return None
         
         return output_file
-        
+
     except Exception as e:
         print(_("下載過程中發生錯誤：{error}").format(error=e))
         return None
+    finally:
+        # 清理資訊暫存檔
+        if info_json_path:
+            _unlink_quiet(info_json_path)
+
+def stream_download_convert(url, video_format, audio_format, output_dir=None, video_info=None):
+    """下載與轉檔融合成單一管線
+
+    yt-dlp 把影片寫到 stdout，ffmpeg 從 stdin 讀入並直接編碼成
+    H.265，最終檔案只寫一次磁碟——省掉中間檔的完整寫入與重讀，
+    下載與編碼也同時進行。
+
+    Args:
+        url (str): 影片URL
+        video_format (dict): 影片格式資訊
+        audio_format (dict): 音訊格式資訊
+        output_dir (str, optional): 輸出目錄
+        video_info (dict, optional): 已取得的完整影片資訊
+
+    Returns:
+        str 或 None: 轉換後的檔案路徑，失敗時為 None
+    """
+    if not video_format and not audio_format:
+        print(_("錯誤：沒有找到可下載的格式"))
+        return None
+
+    # 移除播放清單參數
+    url = _strip_playlist(url)
+
+    output_dir = output_dir or "."
+
+    # 處理格式
+    if video_format and audio_format:
+        format_str = f"{video_format['format_id']}+{audio_format['format_id']}"
+    elif video_format:
+        format_str = video_format['format_id']
+    else:
+        format_str = audio_format['format_id']
+
+    # 以影片標題組出輸出檔名（去掉檔名不允許的字元）
+    title = (video_info or {}).get('title') or 'video'
+    safe_title = re.sub(r'[\\/:*?"<>|]', '_', title)
+    final_output_file = os.path.join(output_dir, f"HEVC_{safe_title}.mp4")
+
+    # yt-dlp 寫到 stdout；分離的影音串流會被合併成可流式讀取的容器
+    yt_dlp_cmd = ["yt-dlp", "-f", format_str, "--no-playlist", "-N", "4", "-o", "-", url]
+
+    # 從原始格式推算轉檔參數
+    video_bitrate, audio_bitrate, fps = _conversion_params(video_format, audio_format)
+    hw_accel = detect_hardware_acceleration()
+
+    # 用預組好的命令模板；-y 與硬體加速參數都屬於輸入前參數
+    ffmpeg_cmd = _ffmpeg_cmd_builder(_quality_mode)(
+        ["-y"] + _hwaccel_input_args(hw_accel, video_format), "pipe:0",
+        video_bitrate, audio_bitrate, fps, final_output_file)
+
+    print(_("即將以串流方式下載並轉換，使用以下命令："))
+    print(" ".join(yt_dlp_cmd) + " | " + " ".join(ffmpeg_cmd))
+
+    try:
+        # 大緩衝區讓下載與編碼充分重疊
+        downloader = subprocess.Popen(yt_dlp_cmd, stdout=subprocess.PIPE,
+                                      bufsize=10 * 1024 * 1024)
+        encoder = subprocess.Popen(ffmpeg_cmd, stdin=downloader.stdout,
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                                   universal_newlines=True)
+        # 讓 yt-dlp 在 ffmpeg 提前結束時收到 SIGPIPE
+        downloader.stdout.close()
+
+        # 顯示進度
+        _run_ffmpeg_with_progress(encoder)
+        downloader.wait()
+
+        if encoder.returncode != 0 or downloader.returncode != 0:
+            print(_("轉換失敗，回傳代碼: {code}").format(
+                code=encoder.returncode or downloader.returncode))
+            return None
+
+        print(_("轉換完成！"))
+        return final_output_file
+    except Exception as e:
+        print(_("轉換過程中發生錯誤：{error}").format(error=e))
+        return None
 
 def convert_to_hevc(input_file, video_format, audio_format):
     """將影片轉換為H.265格式，保持相同的位元率和解析度，並使用硬體加速"""
@@ -310,7 +758,27 @@ def convert_to_hevc(input_file, video_format, audio_format):
         return None
     
     print(_("開始將 {file} 轉換為 H.265 格式...").format(file=os.path.basename(input_file)))
-    
+
+    # 來源已經是 HEVC 的話不用重新編碼，直接重新封裝成 mp4
+    # （-c copy 只搬運封包，幾秒內完成，品質也不會劣化）
+    vcodec = (video_format or {}).get('vcodec', '')
+    if vcodec.startswith(('hev', 'hvc')):
+        print(_("來源影片已是 HEVC 編碼，直接重新封裝不再轉檔"))
+        base_dir = os.path.dirname(input_file)
+        original_name_without_ext = os.path.splitext(os.path.basename(input_file))[0]
+        final_output_file = os.path.join(base_dir, f"HEVC_{original_name_without_ext}.mp4")
+        remux_cmd = ["ffmpeg", "-y", "-i", input_file,
+                     "-c", "copy", "-tag:v", "hvc1", final_output_file]
+        try:
+            result = subprocess.run(remux_cmd, capture_output=True, text=True)
+            if result.returncode == 0:
+                if input_file != final_output_file:
+                    _unlink_quiet(input_file)
+                return final_output_file
+            print(_("重新封裝失敗，改用一般轉檔流程"))
+        except Exception as e:
+            print(_("重新封裝時發生錯誤：{error}").format(error=e))
+
     # 首先重命名檔案
     base_dir = os.path.dirname(input_file)
     file_ext = os.path.splitext(input_file)[1]
@@ -326,110 +794,38 @@ def convert_to_hevc(input_file, video_format, audio_format):
     
     try:
         # 刪除原本臨時檔案
-        if os.path.exists(temp_output_file):
-            os.remove(temp_output_file)
-        # 複製檔案而不是移動，以保留原始檔案
-        shutil.copy2(input_file, temp_file)
-        print(_("已複製檔案以便轉換"))
-        
-        # 從原始格式中獲取影片參數
-        video_bitrate = None
-        if video_format and 'tbr' in video_format:
-            # 使用與原影片相同的位元率
-            video_bitrate = f"{int(video_format['tbr'])}k"
-        else:
-            # 如果無法取得原始位元率，使用合理的預設值（根據解析度）
-            if video_format and 'height' in video_format:
-                height = video_format['height']
-                if height >= 2160:    # 4K
-                    video_bitrate = "30000k"
-                elif height >= 1440:  # 2K
-                    video_bitrate = "15000k"
-                elif height >= 1080:  # 1080p
-                    video_bitrate = "8000k"
-                elif height >= 720:   # 720p
-                    video_bitrate = "4000k"
-                else:                # 480p或更低
-                    video_bitrate = "2000k"
-            else:
-                # 預設位元率
-                video_bitrate = "8000k"
-        
-        # 從原始格式中獲取音訊參數
-        audio_bitrate = None
-        if audio_format and 'tbr' in audio_format:
-            # 使用與原始音訊相同的位元率
-            audio_bitrate = f"{int(audio_format['tbr'])}k"
-        elif audio_format and 'abr' in audio_format and audio_format['abr'] is not None:
-            # 部分格式使用 abr 而非 tbr
-            audio_bitrate = f"{int(audio_format['abr'])}k"
-        else:
-            # 預設音訊位元率
-            audio_bitrate = "192k"
-            print(_("無法確定原始音訊位元率，使用預設值：{bitrate}").format(bitrate=audio_bitrate))
-        
-        # 從原始格式中獲取FPS
-        fps = None
-        if video_format and 'fps' in video_format and video_format['fps'] is not None:
-            fps = video_format['fps']
+        _unlink_quiet(temp_output_file)
+        # 以硬連結代替複製來保留原始檔案，省下整個檔案的磁碟讀寫
+        # （跨檔案系統等無法建立硬連結的情況才退回實際複製）
+        try:
+            os.link(input_file, temp_file)
+            print(_("已建立檔案連結以便轉換"))
+        except OSError:
+            shutil.copy2(input_file, temp_file)
+            print(_("已複製檔案以便轉換"))
         
+        # 從原始格式推算轉檔參數
+        video_bitrate, audio_bitrate, fps = _conversion_params(video_format, audio_format)
+
         # 取得硬體加速資訊
         hw_accel = detect_hardware_acceleration()
         
-        # 使用字串命令而不是陣列，確保參數順序正確
-        # 這是根據提供的成功執行的命令格式
-        cmd_str = (
-            f'ffmpeg -hwaccel {hw_accel["hwaccel"]} -i "{temp_file}" ' +
-            f'-c:v {hw_accel["encoder"]} '
-        )
-        
-        # 添加硬體加速特定選項
-        for option in hw_accel["options"]:
-            if isinstance(option, str) and " " not in option:
-                cmd_str += f"{option} "
-            else:
-                cmd_str += f'"{option}" '
+        # 用預組好的命令模板填入本次轉檔會變動的部分
+        cmd = _ffmpeg_cmd_builder(_quality_mode)(_hwaccel_input_args(hw_accel, video_format), temp_file,
+                                    video_bitrate, audio_bitrate, fps, temp_output_file)
 
-        # 添加FPS參數(如果有)
-        if fps:
-            cmd_str += f'-r {fps} '
-        
-        # 根據不同編碼器添加特定選項
-        if hw_accel["encoder"] == "libx265":
-            cmd_str += '-crf 22 -preset medium -tag:v hvc1 '
-        elif hw_accel["encoder"] == "hevc_nvenc":
-            cmd_str += f'-rc:v vbr -cq:v 22 -b:v {video_bitrate} ' + \
-                     f'-maxrate:v {int(float(video_bitrate.replace("k", "")) * 1.5)}k '
-        elif hw_accel["encoder"] == "hevc_videotoolbox":
-            cmd_str += f'-q:v 50 -b:v {video_bitrate} -tag:v hvc1 '
-        elif hw_accel["encoder"] == "hevc_amf":
-            cmd_str += f'-quality quality -b:v {video_bitrate} '
-        elif hw_accel["encoder"] == "hevc_qsv":
-            cmd_str += f'-b:v {video_bitrate} -global_quality 22 '
-        elif hw_accel["encoder"] == "hevc_vaapi":
-            cmd_str += f'-b:v {video_bitrate} -global_quality 22 '
-        
-        # 添加音訊編碼設定 - 使用原始音訊位元率
-        cmd_str += f'-c:a aac -b:a {audio_bitrate} "{temp_output_file}"'
-        
-        print(_("執行轉換命令：{cmd}").format(cmd=cmd_str))
+        print(_("執行轉換命令：{cmd}").format(cmd=" ".join(cmd)))
         print(_("使用影片位元率: {vbitrate}, 音訊位元率: {abitrate}").format(
             vbitrate=video_bitrate, 
             abitrate=audio_bitrate
         ))
         
         try:
-            # 使用shell=True執行命令字串
-            process = subprocess.Popen(cmd_str, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
-            
+            # 執行ffmpeg轉換
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+
             # 顯示進度
-            for line in process.stdout:
-                if "frame=" in line or "time=" in line:
-                    print(f"\r{line.strip()}", end='')
-                elif "error" in line.lower() or "fatal" in line.lower():
-                    print(f"\n錯誤: {line.strip()}")
-                
-            process.wait()
+            _run_ffmpeg_with_progress(process)
             
             if process.returncode == 0:
                 print(_("轉換完成！"))
@@ -446,11 +842,9 @@ def convert_to_hevc(input_file, video_format, audio_format):
                 
                 # 重命名輸出檔案為原始檔名 + _HEVC.mp4
                 try:
-                    # 如果最終輸出檔案已存在，先刪除
-                    if os.path.exists(final_output_file):
-                        os.remove(final_output_file)
-                    
-                    shutil.move(temp_output_file, final_output_file)
+                    # os.replace 是單一原子 rename，目標存在時直接覆蓋，
+                    # 不需要先 stat + unlink
+                    os.replace(temp_output_file, final_output_file)
                     print(_("已將輸出檔案重命名為: {file}").format(file=os.path.basename(final_output_file)))
                 except Exception as e:
                     print(_("無法重命名輸出檔案: {error}").format(error=e))
@@ -458,11 +852,9 @@ def convert_to_hevc(input_file, video_format, audio_format):
                     final_output_file = temp_output_file
                 
                 # 刪除臨時檔案
-                if os.path.exists(temp_file):
-                    os.remove(temp_file)
+                _unlink_quiet(temp_file)
                 # 刪除原始檔案
-                if os.path.exists(input_file):
-                    os.remove(input_file)
+                _unlink_quiet(input_file)
                 
                 return final_output_file
             else:
@@ -474,14 +866,12 @@ def convert_to_hevc(input_file, video_format, audio_format):
                     fallback_output_file = convert_to_hevc_fallback(temp_file, video_format, audio_format, video_bitrate, audio_bitrate, fps, original_name_without_ext, base_dir)
                     
                     # 刪除臨時檔案
-                    if os.path.exists(temp_file):
-                        os.remove(temp_file)
+                    _unlink_quiet(temp_file)
                         
                     return fallback_output_file
                 
                     # 刪除原始檔案
-                    if os.path.exists(input_file):
-                        os.remove(input_file)
+                    _unlink_quiet(input_file)
                     
                 return None
         except Exception as e:
@@ -493,22 +883,19 @@ def convert_to_hevc(input_file, video_format, audio_format):
                 fallback_output_file = convert_to_hevc_fallback(temp_file, video_format, audio_format, video_bitrate, audio_bitrate, fps, original_name_without_ext, base_dir)
                 
                 # 刪除臨時檔案
-                if os.path.exists(temp_file):
-                    os.remove(temp_file)
+                _unlink_quiet(temp_file)
                     
                 return fallback_output_file
             
             # 刪除臨時檔案
-            if os.path.exists(temp_file):
-                os.remove(temp_file)
+            _unlink_quiet(temp_file)
                 
             return None
     except Exception as e:
         print(_("處理檔案時發生錯誤：{error}").format(error=e))
         
         # 確保清理臨時檔案
-        if os.path.exists(temp_file):
-            os.remove(temp_file)
+        _unlink_quiet(temp_file)
             
         return None
 
@@ -527,20 +914,19 @@ def convert_to_hevc_fallback(input_file, video_format, audio_format, video_bitra
     temp_output_file = os.path.join(base_dir, "converted_HEVC_SW.mp4")
     final_output_file = os.path.join(base_dir, f"{original_name_without_ext}_HEVC_SW.mp4")
     
-    # 使用字串命令
-    cmd_str = f'ffmpeg -i "{input_file}" '
+    # 以參數列表組合命令，交由 Popen 直接執行（不經過 shell）
+    cmd = ["ffmpeg", "-i", input_file]
     
     # 如果有FPS資訊，加入命令
     if fps:
-        cmd_str += f'-r {fps} '
+        cmd += ["-r", str(fps)]
     
     # 添加影片和聲音編碼設定
-    cmd_str += (
-        f'-c:v libx265 -crf 22 -preset medium -tag:v hvc1 ' +
-        f'-b:v {video_bitrate} -c:a aac -b:a {audio_bitrate} "{temp_output_file}"'
-    )
+    cmd += ["-c:v", "libx265", "-crf", "22", "-preset", "medium", "-tag:v", "hvc1",
+            "-b:v", video_bitrate, "-c:a", "aac", "-b:a", audio_bitrate,
+            "-progress", "pipe:1", "-nostats", temp_output_file]
     
-    print(_("執行軟體編碼轉換命令：{cmd}").format(cmd=cmd_str))
+    print(_("執行軟體編碼轉換命令：{cmd}").format(cmd=" ".join(cmd)))
     print(_("使用影片位元率: {vbitrate}, 音訊位元率: {abitrate}").format(
         vbitrate=video_bitrate, 
         abitrate=audio_bitrate
@@ -548,93 +934,10 @@ def convert_to_hevc_fallback(input_file, video_format, audio_format, video_bitra
     
     try:
         # 執行ffmpeg轉換
-        process = subprocess.Popen(cmd_str, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
-        
-        # 顯示進度
-        for line in process.stdout:
-            if "frame=" in line or "time=" in line:
-                print(f"\r{line.strip()}", end='')
-            
-        process.wait()
-        
-        if process.returncode == 0:
-            print(_("\n轉換完成！"))
-            
-            # 顯示檔案大小比較
-            original_size = os.path.getsize(input_file)
-            converted_size = os.path.getsize(temp_output_file)
-            compression_ratio = (1 - converted_size / original_size) * 100
-            
-            print(_("檔案大小比較:"))
-            print(_("  原始檔案: {size:.2f} MB").format(size=original_size / (1024*1024)))
-            print(_("  轉換後檔案: {size:.2f} MB").format(size=converted_size / (1024*1024)))
-            print(_("  節省空間: {ratio:.2f}%").format(ratio=compression_ratio))
-            
-            # 重命名輸出檔案
-            try:
-                # 如果最終輸出檔案已存在，先刪除
-                if os.path.exists(final_output_file):
-                    os.remove(final_output_file)
-                
-                shutil.move(temp_output_file, final_output_file)
-                print(_("已將輸出檔案重命名為: {file}").format(file=os.path.basename(final_output_file)))
-            except Exception as e:
-                print(_("無法重命名輸出檔案: {error}").format(error=e))
-                # 如果重命名失敗，使用原臨時名稱
-                final_output_file = temp_output_file
-            
-            return final_output_file
-        else:
-            print(_("轉換失敗，回傳代碼: {code}").format(code=process.returncode))
-            return None
-    except Exception as e:
-        print(_("轉換過程中發生錯誤：{error}").format(error=e))
-        return None
-
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
 
-def convert_to_hevc_fallback(input_file, video_format, audio_format, video_bitrate, audio_bitrate, fps, original_name_without_ext=None, base_dir=None):
-    """使用軟體編碼的備用轉換方法"""
-    # 如果沒有提供原始檔名相關資訊，則從input_file提取
-    if original_name_without_ext is None:
-        original_basename = os.path.basename(input_file)
-        original_name_without_ext = os.path.splitext(original_basename)[0]
-    
-    if base_dir is None:
-        base_dir = os.path.dirname(input_file)
-    
-    # 確定輸出檔案名稱
-    temp_output_file = os.path.join(base_dir, "converted_HEVC_SW.mp4")
-    final_output_file = os.path.join(base_dir, f"{original_name_without_ext}_HEVC_SW.mp4")
-    
-    # 使用字串命令
-    cmd_str = f'ffmpeg -i "{input_file}" '
-    
-    # 如果有FPS資訊，加入命令
-    if fps:
-        cmd_str += f'-r {fps} '
-    
-    # 添加影片和聲音編碼設定
-    cmd_str += (
-        f'-c:v libx265 -crf 22 -preset medium -tag:v hvc1 ' +
-        f'-b:v {video_bitrate} -c:a aac -b:a {audio_bitrate} "{temp_output_file}"'
-    )
-    
-    print(_("執行軟體編碼轉換命令：{cmd}").format(cmd=cmd_str))
-    print(_("使用影片位元率: {vbitrate}, 音訊位元率: {abitrate}").format(
-        vbitrate=video_bitrate, 
-        abitrate=audio_bitrate
-    ))
-    
-    try:
-        # 執行ffmpeg轉換
-        process = subprocess.Popen(cmd_str, shell=True, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
-        
         # 顯示進度
-        for line in process.stdout:
-            if "frame=" in line or "time=" in line:
-                print(f"\r{line.strip()}", end='')
-            
-        process.wait()
+        _run_ffmpeg_with_progress(process)
         
         if process.returncode == 0:
             print(_("\n轉換完成！"))
@@ -651,11 +954,8 @@ def convert_to_hevc_fallback(input_file, video_format, audio_format, video_bitra
             
             # 重命名輸出檔案
             try:
-                # 如果最終輸出檔案已存在，先刪除
-                if os.path.exists(final_output_file):
-                    os.remove(final_output_file)
-                
-                shutil.move(temp_output_file, final_output_file)
+                # os.replace 是單一原子 rename，目標存在時直接覆蓋
+                os.replace(temp_output_file, final_output_file)
                 print(_("已將輸出檔案重命名為: {file}").format(file=os.path.basename(final_output_file)))
             except Exception as e:
                 print(_("無法重命名輸出檔案: {error}").format(error=e))
@@ -670,24 +970,32 @@ def convert_to_hevc_fallback(input_file, video_format, audio_format, video_bitra
         print(_("轉換過程中發生錯誤：{error}").format(error=e))
         return None
 
+
+@lru_cache(maxsize=1)
 def test_ffmpeg_capabilities():
-    """測試 ffmpeg 的編碼器支援情況"""
+    """測試 ffmpeg 的編碼器支援情況
+
+    ffmpeg -encoders 不便宜，結果也不會改變，同樣只執行一次。
+    """
     print(_("測試 ffmpeg 的編碼器支援情況..."))
     
     try:
-        # 取得支援的編碼器列表
-        encoders_result = subprocess.run(["ffmpeg", "-encoders"], capture_output=True, text=True)
-        
-        # 檢查各種 HEVC 編碼器是否支援
-        encoders = encoders_result.stdout
+        # 取得支援的編碼器列表（-hide_banner/-loglevel error 可省掉大量說明文字）
+        encoders_result = subprocess.run(["ffmpeg", "-hide_banner", "-loglevel", "error", "-encoders"],
+                                         capture_output=True, text=True, timeout=5)
         
+        # 先把輸出解析成編碼器名稱集合，之後每個查詢都是 O(1)，
+        # 不用對整段輸出重複做子字串掃描
+        available = {
+            m.group(1)
+            for line in encoders_result.stdout.splitlines()
+            if (m := _ENC_RE.match(line))
+        }
+
         support_info = {
-            "libx265": "libx265" in encoders,
-            "hevc_nvenc": "hevc_nvenc" in encoders,
-            "hevc_videotoolbox": "hevc_videotoolbox" in encoders,
-            "hevc_amf": "hevc_amf" in encoders,
-            "hevc_qsv": "hevc_qsv" in encoders,
-            "hevc_vaapi": "hevc_vaapi" in encoders
+            name: name in available
+            for name in ("libx265", "hevc_nvenc", "hevc_videotoolbox",
+                         "hevc_amf", "hevc_qsv", "hevc_vaapi")
         }
         
         print(_("FFmpeg 編碼器支援情況:"))
@@ -698,7 +1006,7 @@ def test_ffmpeg_capabilities():
             ))
         
         # 取得支援的硬體加速方法
-        hwaccel_result = subprocess.run(["ffmpeg", "-hwaccels"], capture_output=True, text=True)
+        hwaccel_result = subprocess.run(["ffmpeg", "-hide_banner", "-hwaccels"], capture_output=True, text=True, timeout=5)
         
         print(_("FFmpeg 硬體加速支援情況:"))
         for line in hwaccel_result.stdout.splitlines()[1:]:  # 跳過第一行標題
@@ -710,20 +1018,102 @@ def test_ffmpeg_capabilities():
         print(_("測試 ffmpeg 能力時發生錯誤: {error}").format(error=e))
         return {}
 
+def _parse_args():
+    """解析命令列參數；未提供的項目稍後以互動方式詢問"""
+    parser = argparse.ArgumentParser(description=_("下載YouTube影片並轉換為H.265格式"))
+    parser.add_argument("url", nargs="?", help=_("YouTube影片URL"))
+    parser.add_argument("output_dir", nargs="?", help=_("儲存目錄"))
+    parser.add_argument("--quality-mode", choices=("speed", "balanced", "quality"),
+                        default="balanced",
+                        help=_("NVENC 編碼取向：speed 最快，quality 品質最好"))
+    parser.add_argument("-a", "--batch-file",
+                        help=_("批次模式：從檔案讀取URL清單，每行一個"))
+    return parser.parse_args()
+
+def _pool_init(quality_mode):
+    """Pool worker 初始化：把父行程選定的品質模式帶進子行程"""
+    global _quality_mode
+    _quality_mode = quality_mode
+
+def process_one(task):
+    """批次模式下處理單一URL的完整流程（全程不互動）
+
+    Args:
+        task (tuple): (url, output_dir)
+
+    Returns:
+        tuple: (url, 轉換後的檔案路徑或 None)
+    """
+    url, output_dir = task
+    try:
+        video_info = get_video_info(url)
+        video_formats, audio_formats = filter_formats(video_info.get('formats', []))
+        best_video, best_audio = get_best_formats(video_formats, audio_formats)
+
+        result = stream_download_convert(url, best_video, best_audio, output_dir,
+                                         video_info=video_info)
+        if not result:
+            # 串流管線失敗時退回先下載再轉檔
+            output_file = download_video(url, best_video, best_audio, output_dir,
+                                         video_info=video_info)
+            if output_file:
+                result = convert_to_hevc(output_file, best_video, best_audio)
+        return url, result
+    except (Exception, SystemExit) as e:
+        # get_video_info 失敗會 sys.exit；批次模式下只放棄這一個 URL
+        print(_("處理 {url} 時發生錯誤：{error}").format(url=url, error=e))
+        return url, None
+
+def _run_batch(urls, output_dir):
+    """用常駐的 worker pool 批次處理多個 URL
+
+    Pool 只建一次、全部做完才 close/join，行程啟動成本可以攤提，
+    不同影片的下載與編碼也會互相重疊。消費級 NVIDIA 顯卡同時
+    只允許兩個 NVENC session，用 NVENC 時 worker 數上限為 2。
+    """
+    hw_accel = detect_hardware_acceleration()
+    workers = min(4, os.cpu_count() or 1, len(urls))
+    if hw_accel["encoder"] == "hevc_nvenc":
+        workers = min(workers, 2)
+
+    pool = multiprocessing.Pool(processes=workers, initializer=_pool_init,
+                                initargs=(_quality_mode,))
+    try:
+        done = 0
+        tasks = [(url, output_dir) for url in urls]
+        for url, result in pool.imap_unordered(process_one, tasks):
+            done += 1
+            if result:
+                print(_("[{done}/{total}] 完成：{file}").format(
+                    done=done, total=len(urls), file=result))
+            else:
+                print(_("[{done}/{total}] 失敗：{url}").format(
+                    done=done, total=len(urls), url=url))
+    finally:
+        pool.close()
+        pool.join()
+
 def main():
+    global _quality_mode
+    args = _parse_args()
+    _quality_mode = args.quality_mode
+
     # 檢查必要的程式是否安裝
     try:
         # 檢查 yt-dlp
-        version_result = subprocess.run(["yt-dlp", "--version"], capture_output=True, text=True)
+        version_result = subprocess.run(["yt-dlp", "--version"], capture_output=True, text=True, timeout=5)
         print(_("偵測到 yt-dlp 版本: {version}").format(version=version_result.stdout.strip()))
         
         # 檢查 ffmpeg
-        ffmpeg_result = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True)
+        ffmpeg_result = subprocess.run(["ffmpeg", "-version"], capture_output=True, text=True, timeout=5)
         print(_("偵測到 ffmpeg 已安裝"))
         
         # 測試 ffmpeg 能力
         ffmpeg_capabilities = test_ffmpeg_capabilities()
         
+    except subprocess.TimeoutExpired as e:
+        print(_("錯誤：檢查 {cmd} 時逾時，請確認程式是否正常運作").format(cmd=e.cmd[0]))
+        sys.exit(1)
     except FileNotFoundError as e:
         if "yt-dlp" in str(e):
             print(_("錯誤：未找到 yt-dlp。請先安裝 yt-dlp。"))
@@ -734,27 +1124,36 @@ def main():
             print(_("錯誤：未找到 ffmpeg。請先安裝 ffmpeg。"))
             print(_("可以參考 https://ffmpeg.org/download.html 安裝指南"))
             sys.exit(1)
-    
+
+    # 批次模式：從檔案讀取URL清單，交給常駐 worker pool 處理
+    if args.batch_file:
+        with open(args.batch_file, encoding="utf-8") as f:
+            urls = [line.strip() for line in f
+                    if line.strip() and not line.startswith("#")]
+        if not urls:
+            print(_("錯誤：批次檔中沒有任何URL"))
+            sys.exit(1)
+        output_dir = args.output_dir or os.path.expanduser("~/Downloads")
+        _run_batch(urls, output_dir)
+        return
+
     # 獲取影片URL
-    if len(sys.argv) > 1:
-        url = sys.argv[1]
-    else:
-        url = input(_("請輸入YouTube影片URL: ")).strip()
+    url = args.url or input(_("請輸入YouTube影片URL: ")).strip()
     
     if not url:
         print(_("錯誤：URL不能為空"))
         sys.exit(1)
         
     # 檢查URL格式
-    if not re.search(r'youtube\.com/watch\?v=|youtu\.be/', url):
+    if not _YOUTUBE_URL_RE.search(url):
         print(_("警告：URL格式可能不正確，請確認是否為有效的YouTube影片URL"))
         continue_anyway = input(_("是否繼續？(y/n): ")).strip().lower()
         if continue_anyway != 'y':
             sys.exit(1)
     
     # 獲取輸出目錄
-    if len(sys.argv) > 2:
-        output_dir = sys.argv[2]
+    if args.output_dir:
+        output_dir = args.output_dir
     else:
         default_dir = os.path.expanduser("~/Downloads")
         output_dir = input(_("請輸入儲存目錄（預設為{dir}）: ").format(dir=default_dir)).strip()
@@ -796,17 +1195,26 @@ def main():
         print(_("已取消下載"))
         sys.exit(0)
     
-    # 下載影片
-    output_file = download_video(url, best_video, best_audio, output_dir)
+    # 先問是否壓縮：要壓縮就走下載與編碼同時進行的串流管線，
+    # 不用等整個檔案下載完才開始轉檔
     confirm = input(_("是否進行壓縮？(y/n): ")).strip().lower()
     if confirm != 'y' and confirm != '':
         print(_("不進行壓縮"))
+        # 只下載（重用已取得的影片資訊，避免第二次擷取）
+        download_video(url, best_video, best_audio, output_dir, video_info=video_info)
         sys.exit(0)
 
-    if output_file:
-        hevc_file = convert_to_hevc(output_file, best_video, best_audio)
-        if hevc_file:
-            print(_("轉換成功，檔案位置：{file}").format(file=hevc_file))
+    hevc_file = stream_download_convert(url, best_video, best_audio, output_dir, video_info=video_info)
+    if hevc_file:
+        print(_("轉換成功，檔案位置：{file}").format(file=hevc_file))
+    else:
+        # 串流管線失敗時退回傳統流程：先下載完整檔案再轉檔
+        print(_("串流轉換失敗，改用先下載再轉檔的方式..."))
+        output_file = download_video(url, best_video, best_audio, output_dir, video_info=video_info)
+        if output_file:
+            hevc_file = convert_to_hevc(output_file, best_video, best_audio)
+            if hevc_file:
+                print(_("轉換成功，檔案位置：{file}").format(file=hevc_file))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file